@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'release' / 'linux' / 'py36'))
+
+try:
+    from wepppyo3.climate import interpolate_geospatial_batch
+except ImportError:
+    pytest.skip('wepppyo3.climate extension not importable', allow_module_level=True)
+
+
+def test_large_batch_exceeds_cv2_shrt_max():
+    # cv2.remap asserts both destination dimensions are below SHRT_MAX (32767);
+    # a flat destination layout fails for batches this size
+    n_targets = 40_000
+
+    eastings = np.linspace(0.0, 100.0, 101)
+    northings = np.linspace(0.0, 50.0, 51)
+    data = northings[:, None] + eastings[None, :]
+
+    rng = np.random.RandomState(42)
+    targets_e = rng.uniform(eastings[0], eastings[-1], n_targets)
+    targets_n = rng.uniform(northings[0], northings[-1], n_targets)
+
+    sampled = interpolate_geospatial_batch(targets_e, targets_n, eastings, northings, data)
+
+    assert sampled.shape == (n_targets,)
+    np.testing.assert_allclose(sampled, targets_n + targets_e, atol=1e-2)
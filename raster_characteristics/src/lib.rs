@@ -1,8 +1,278 @@
 use pyo3::prelude::*;
 use pyo3::wrap_pyfunction;
-use std::collections::{HashSet, HashMap};
+use pyo3::exceptions::{PyIOError, PyValueError};
+use std::collections::HashMap;
 
-use raster::raster::Raster;
+use rustc_hash::FxHashMap;
+
+use numpy::{PyArray1, PyReadonlyArray1};
+
+use rayon::prelude::*;
+
+use gdal::Dataset;
+use gdal::raster::RasterBand;
+
+/// Minimum number of rows to read per streaming chunk.
+///
+/// Striped GeoTIFFs report a native block height of 1; reading row-by-row would pay
+/// GDAL's RasterIO overhead once per row, so chunks are grown to a multiple of the
+/// native block height that covers at least this many rows.
+const MIN_CHUNK_ROWS: usize = 256;
+
+/// Number of rows to stream per `read_as` call for `band`, aligned to the band's
+/// native block height so each block is decoded exactly once.
+fn chunk_rows(band: &RasterBand) -> usize {
+    let (_block_width, block_height) = band.block_size();
+    let block_height = block_height.max(1);
+    ((MIN_CHUNK_ROWS + block_height - 1) / block_height) * block_height
+}
+
+/// Open a raster dataset, mapping GDAL failures to a descriptive `IOError`.
+fn open_dataset(path: &str) -> PyResult<Dataset> {
+    Dataset::open(path)
+        .map_err(|e| PyIOError::new_err(format!("failed to open raster {}: {}", path, e)))
+}
+
+/// Fetch a band, mapping GDAL failures (e.g. an out-of-range index) to a `ValueError`.
+fn open_band<'a>(ds: &'a Dataset, path: &str, band_indx: isize) -> PyResult<RasterBand<'a>> {
+    ds.rasterband(band_indx)
+        .map_err(|e| PyValueError::new_err(format!("failed to open band {} of {}: {}", band_indx, path, e)))
+}
+
+/// Require `ds` to share the key raster's grid dimensions.
+///
+/// Validating once up front lets the chunk scans assume identical indexing across
+/// rasters (the zipped slice iteration carries no per-pixel bounds checks) instead
+/// of silently truncating to the shortest raster as the kernels previously did.
+fn check_same_size(path: &str, ds: &Dataset, ref_path: &str, ref_size: (usize, usize)) -> PyResult<()> {
+    let size = ds.raster_size();
+    if size != ref_size {
+        return Err(PyValueError::new_err(format!(
+            "raster dimensions differ: {} is {}x{} but {} is {}x{}",
+            ref_path, ref_size.0, ref_size.1, path, size.0, size.1
+        )));
+    }
+    Ok(())
+}
+
+/// Pack an intersecting `(key, key2)` pair into one `u64` so it can serve as a
+/// single radix-sortable key. The bit casts keep negative keys distinct; ordering
+/// of the packed value only has to group equal pairs, not match signed order.
+#[inline(always)]
+fn pack_keys(key: i32, key2: i32) -> u64 {
+    ((key as u32 as u64) << 32) | (key2 as u32 as u64)
+}
+
+#[inline(always)]
+fn unpack_keys(packed: u64) -> (i32, i32) {
+    ((packed >> 32) as u32 as i32, packed as u32 as i32)
+}
+
+/// Locate the contiguous key runs of a key-sorted accumulator as (start, end) index
+/// pairs. The runs delimit per-key value slices for the reduction step, which is
+/// embarrassingly parallel across keys.
+fn key_runs<K: PartialEq, V>(accum: &[(K, V)]) -> Vec<(usize, usize)> {
+    let mut runs: Vec<(usize, usize)> = Vec::new();
+    let mut start: usize = 0;
+    while start < accum.len() {
+        let mut end = start + 1;
+        while end < accum.len() && accum[end].0 == accum[start].0 {
+            end += 1;
+        }
+        runs.push((start, end));
+        start = end;
+    }
+    runs
+}
+
+/// Membership test against a small sorted ignore table.
+///
+/// Ignore tables are typically a handful of keys, so the linear OR-reduction is both
+/// branchless and auto-vectorizable: LLVM compiles it to packed integer compares (a
+/// single vector register's worth for tables of up to 8 keys), keeping the per-pixel
+/// scan free of hash probes and unpredictable branches. Larger tables fall back to a
+/// binary search.
+#[inline(always)]
+fn is_ignored(sorted_keys: &[i32], key: i32) -> bool {
+    if sorted_keys.len() <= 8 {
+        let mut hit = false;
+        for &ignore_key in sorted_keys {
+            hit |= ignore_key == key;
+        }
+        hit
+    } else {
+        sorted_keys.binary_search(&key).is_ok()
+    }
+}
+
+/// Per-call specialization of the ignore-key membership test.
+///
+/// Landcover/soil ignore lists are often contiguous small integers (e.g.
+/// `range(0, 10)` for water/urban codes). When every key fits in 0..128 the
+/// table collapses to a `u128` bitset probed with one shift and one AND —
+/// branchless, no hashing, no memory access. Other tables keep the sorted-slice
+/// probe from `is_ignored`. The representation is chosen once per call, outside
+/// the per-pixel scan.
+enum IgnoreFilter<'a> {
+    Bitset(u128),
+    Table(&'a [i32]),
+}
+
+impl<'a> IgnoreFilter<'a> {
+    fn new(sorted_keys: &'a [i32]) -> Self {
+        // Scan for the actual min/max rather than trusting first()/last():
+        // an unsorted table reaching this layer must fall back to the slice
+        // probe instead of shifting by an out-of-range key. The table is
+        // tiny and the filter is built once per chunk, so the scan is free.
+        if !sorted_keys.is_empty()
+            && sorted_keys.iter().all(|&key| (0..128).contains(&key))
+        {
+            let mut bits: u128 = 0;
+            for &key in sorted_keys {
+                bits |= 1u128 << key;
+            }
+            IgnoreFilter::Bitset(bits)
+        } else {
+            IgnoreFilter::Table(sorted_keys)
+        }
+    }
+
+    fn is_empty(&self) -> bool {
+        match self {
+            IgnoreFilter::Bitset(bits) => *bits == 0,
+            IgnoreFilter::Table(table) => table.is_empty(),
+        }
+    }
+
+    #[inline(always)]
+    fn contains(&self, key: i32) -> bool {
+        match self {
+            IgnoreFilter::Bitset(bits) => (key as u32) < 128 && (bits >> key as u32) & 1 == 1,
+            IgnoreFilter::Table(table) => is_ignored(table, key),
+        }
+    }
+}
+
+/// How far ahead of the scan cursor to prefetch, in elements. 64 i32 elements is
+/// four cache lines — far enough to cover the accumulator work per pixel, close
+/// enough that the lines are still resident when the cursor arrives.
+const PREFETCH_DISTANCE: usize = 64;
+
+/// Hint the CPU to start pulling the cache line holding `slice[indx]` while the
+/// current elements are processed. The scan is memory bound, so overlapping the
+/// next lines' fetch with the accumulator work hides most of the miss latency.
+/// Compiles to nothing on non-x86_64 targets.
+#[inline(always)]
+fn prefetch_read<T>(slice: &[T], indx: usize) {
+    #[cfg(target_arch = "x86_64")]
+    {
+        if indx < slice.len() {
+            unsafe {
+                use std::arch::x86_64::{_mm_prefetch, _MM_HINT_T0};
+                _mm_prefetch(slice.as_ptr().add(indx) as *const i8, _MM_HINT_T0);
+            }
+        }
+    }
+    #[cfg(not(target_arch = "x86_64"))]
+    {
+        let _ = (slice, indx);
+    }
+}
+
+/// Monomorphized single-key chunk scan. The const parameters let LLVM delete the
+/// channel test and the ignore-table probe outright for the common call patterns
+/// (`ignore_channels=False`, empty ignore table) instead of re-testing per pixel.
+#[inline(always)]
+fn scan_chunk_single_inner<V, const IGNORE_CHANNELS: bool, const HAS_IGNORE_KEYS: bool>(
+    keys: &[i32],
+    vals: &[V],
+    ignore_keys: &IgnoreFilter,
+    emit: &mut impl FnMut(i32, &V)
+) {
+    for (i, (key, val)) in keys.iter().zip(vals.iter()).enumerate() {
+        prefetch_read(keys, i + PREFETCH_DISTANCE);
+        prefetch_read(vals, i + PREFETCH_DISTANCE);
+
+        if IGNORE_CHANNELS && key % 10 == 4 {
+            continue;
+        }
+
+        if HAS_IGNORE_KEYS && ignore_keys.contains(*key) {
+            continue;
+        }
+
+        emit(*key, val);
+    }
+}
+
+/// Dispatch one streamed chunk of a single-key kernel to the matching
+/// `scan_chunk_single_inner` instantiation.
+#[inline(always)]
+fn scan_chunk_single<V>(
+    keys: &[i32],
+    vals: &[V],
+    ignore_channels: bool,
+    ignore_keys: &[i32],
+    emit: &mut impl FnMut(i32, &V)
+) {
+    let ignore_keys = &IgnoreFilter::new(ignore_keys);
+    match (ignore_channels, !ignore_keys.is_empty()) {
+        (true, true) => scan_chunk_single_inner::<V, true, true>(keys, vals, ignore_keys, emit),
+        (true, false) => scan_chunk_single_inner::<V, true, false>(keys, vals, ignore_keys, emit),
+        (false, true) => scan_chunk_single_inner::<V, false, true>(keys, vals, ignore_keys, emit),
+        (false, false) => scan_chunk_single_inner::<V, false, false>(keys, vals, ignore_keys, emit),
+    }
+}
+
+/// Monomorphized intersecting-keys chunk scan; see `scan_chunk_single_inner`.
+/// `HAS_IGNORE_KEYS` covers both tables: `is_ignored` on an empty table is free.
+#[inline(always)]
+fn scan_chunk_intersecting_inner<V, const IGNORE_CHANNELS: bool, const HAS_IGNORE_KEYS: bool>(
+    keys: &[i32],
+    keys2: &[i32],
+    vals: &[V],
+    ignore_keys: &IgnoreFilter,
+    ignore_keys2: &IgnoreFilter,
+    emit: &mut impl FnMut(i32, i32, &V)
+) {
+    for (i, ((key, key2), val)) in keys.iter().zip(keys2.iter()).zip(vals.iter()).enumerate() {
+        prefetch_read(keys, i + PREFETCH_DISTANCE);
+        prefetch_read(keys2, i + PREFETCH_DISTANCE);
+        prefetch_read(vals, i + PREFETCH_DISTANCE);
+
+        if IGNORE_CHANNELS && key % 10 == 4 {
+            continue;
+        }
+
+        if HAS_IGNORE_KEYS && (ignore_keys.contains(*key) || ignore_keys2.contains(*key2)) {
+            continue;
+        }
+
+        emit(*key, *key2, val);
+    }
+}
+
+/// Dispatch one streamed chunk of an intersecting-keys kernel to the matching
+/// `scan_chunk_intersecting_inner` instantiation.
+#[inline(always)]
+fn scan_chunk_intersecting<V>(
+    keys: &[i32],
+    keys2: &[i32],
+    vals: &[V],
+    ignore_channels: bool,
+    ignore_keys: &[i32],
+    ignore_keys2: &[i32],
+    emit: &mut impl FnMut(i32, i32, &V)
+) {
+    let ignore_keys = &IgnoreFilter::new(ignore_keys);
+    let ignore_keys2 = &IgnoreFilter::new(ignore_keys2);
+    match (ignore_channels, !ignore_keys.is_empty() || !ignore_keys2.is_empty()) {
+        (true, true) => scan_chunk_intersecting_inner::<V, true, true>(keys, keys2, vals, ignore_keys, ignore_keys2, emit),
+        (true, false) => scan_chunk_intersecting_inner::<V, true, false>(keys, keys2, vals, ignore_keys, ignore_keys2, emit),
+        (false, true) => scan_chunk_intersecting_inner::<V, false, true>(keys, keys2, vals, ignore_keys, ignore_keys2, emit),
+        (false, false) => scan_chunk_intersecting_inner::<V, false, false>(keys, keys2, vals, ignore_keys, ignore_keys2, emit),
+    }
+}
 
 /// Identify the mode (most common) value of each key in a raster dataset.
 ///
@@ -17,8 +287,8 @@ use raster::raster::Raster;
 /// * `key_fn: &str` - The file path to the raster data to be used as keys.
 /// * `parameter_fn: &str` - The file path to the raster data to determine the mode value for each key.
 /// * `ignore_channels: bool` - If `true`, keys that end in 4.
-/// * `mut ignore_keys: HashSet<i32>` - A set of keys to be ignored during processing. If a "no data" 
-///    value is defined in `key_map`, it is automatically added to this set.
+/// * `ignore_keys: numpy.ndarray` - A 1-d `int32` array of keys to ignore, sorted ascending.
+///    The key raster's "no data" value is always excluded, whether or not it appears here.
 ///
 /// # Returns
 /// 
@@ -28,9 +298,8 @@ use raster::raster::Raster;
 ///
 /// # Errors
 /// 
-/// Returns `Err` if there is a failure reading the raster data from the provided file paths.
-/// Note: The current implementation uses `unwrap()` which may cause panics on errors 
-/// (to be improved for production use).
+/// Raises `IOError` if a raster cannot be opened, and `ValueError` if the band index is
+/// invalid or the rasters do not share the same dimensions.
 ///
 /// # Example
 /// 
@@ -38,65 +307,121 @@ use raster::raster::Raster;
 /// let key_fn = "path/to/key_map.tif";
 /// let parameter_fn = "path/to/parameter_map.tif";
 /// let ignore_channels = false;
-/// let mut ignore_keys = HashSet::new();
-/// ignore_keys.insert(-9999);
+/// let ignore_keys = numpy.array([-9999], dtype=numpy.int32)  # built on the Python side
 /// 
 /// let result = identify_mode_single_raster_key(key_fn, parameter_fn, ignore_channels, ignore_keys);
 /// ```
 ///
 /// # Note
 ///
-/// Ensure that the raster datasets provided via `key_fn` and `parameter_fn` are of 
-/// identical dimensions, as the function does not perform dimensionality checks.
+/// Raster dimensions are validated once up front, so the per-pixel scan can assume
+/// identical indexing across rasters.
+///
+/// The GIL is released while the rasters are read and scanned, so multiple rasters can be
+/// processed concurrently from a Python `ThreadPoolExecutor`.
 ///
 /// # Panics
 ///
-/// The function may panic if it is unable to read the raster data from the provided paths.
+/// The function may panic if a raster fails mid-scan after validation (e.g. a truncated file).
 #[pyfunction]
 fn identify_mode_single_raster_key(
-    key_fn: &str, 
-    parameter_fn: &str, 
+    py: Python,
+    key_fn: &str,
+    parameter_fn: &str,
     ignore_channels: bool,
-    mut ignore_keys: HashSet<i32>,
+    ignore_keys: PyReadonlyArray1<i32>,
     band_indx: isize
 ) -> PyResult<HashMap<String, i32>> {
+    let ignore_keys: &[i32] = ignore_keys.as_slice()?;
 
-    let key_map: Raster<i32> = Raster::<i32>::read(key_fn).unwrap();
-    let parameter_map: Raster<i32> = Raster::<i32>::read_band(parameter_fn, band_indx).unwrap();
+    let modes = py.allow_threads(move || mode_single_raster_key_impl(
+        key_fn, parameter_fn, ignore_channels, ignore_keys, band_indx
+    ))?;
 
-    if let Some(no_data_value) = key_map.no_data {
-        ignore_keys.insert(no_data_value);
-    }
+    Ok(modes.into_iter().map(|(key, val)| (key.to_string(), val)).collect())
+}
 
-    let mut count_d: HashMap<i32, HashMap<i32, usize>> = HashMap::new();
+/// Array-returning variant of `identify_mode_single_raster_key`.
+///
+/// Returns `(keys, modes)` as a pair of 1-d `int32` NumPy arrays sorted by key,
+/// built with two bulk copies instead of one Python string and dict entry per
+/// key. Preferred when the caller indexes the result with NumPy anyway.
+#[pyfunction]
+fn identify_mode_single_raster_key_arrays<'py>(
+    py: Python<'py>,
+    key_fn: &str,
+    parameter_fn: &str,
+    ignore_channels: bool,
+    ignore_keys: PyReadonlyArray1<i32>,
+    band_indx: isize
+) -> PyResult<(&'py PyArray1<i32>, &'py PyArray1<i32>)> {
+    let ignore_keys: &[i32] = ignore_keys.as_slice()?;
 
-    for (key, val) in key_map.data.iter().zip(parameter_map.data.iter()) {
-        if ignore_channels && key % 10 == 4 {
-            continue;
-        }
+    let modes = py.allow_threads(move || mode_single_raster_key_impl(
+        key_fn, parameter_fn, ignore_channels, ignore_keys, band_indx
+    ))?;
 
+    let (keys, vals): (Vec<i32>, Vec<i32>) = modes.into_iter().unzip();
+    Ok((PyArray1::from_vec(py, keys), PyArray1::from_vec(py, vals)))
+}
 
-        if let Some(no_data_value) = parameter_map.no_data {
-            if no_data_value == *val {
-                continue;
+fn mode_single_raster_key_impl(
+    key_fn: &str,
+    parameter_fn: &str,
+    ignore_channels: bool,
+    ignore_keys: &[i32],
+    band_indx: isize
+) -> PyResult<Vec<(i32, i32)>> {
+
+    let key_ds = open_dataset(key_fn)?;
+    let key_band = open_band(&key_ds, key_fn, 1)?;
+    let parameter_ds = open_dataset(parameter_fn)?;
+    let parameter_band = open_band(&parameter_ds, parameter_fn, band_indx)?;
+
+    let (width, height) = key_ds.raster_size();
+    check_same_size(parameter_fn, &parameter_ds, key_fn, (width, height))?;
+
+    let key_no_data: Option<i32> = key_band.no_data_value().map(|v| v as i32);
+    let parameter_no_data: Option<i32> = parameter_band.no_data_value().map(|v| v as i32);
+
+    // FxHashMap: the keys are small raster integers, so SipHash's DoS hardening
+    // buys nothing and its throughput cost dominates the scalar accumulation loop
+    let mut count_d: FxHashMap<i32, FxHashMap<i32, usize>> = FxHashMap::default();
+
+    let chunk = chunk_rows(&parameter_band);
+    let mut y: usize = 0;
+    while y < height {
+        let rows = chunk.min(height - y);
+        let keys = key_band.read_as::<i32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+        let vals = parameter_band.read_as::<i32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+
+        scan_chunk_single(&keys, &vals, ignore_channels, ignore_keys, &mut |key, val: &i32| {
+            if let Some(no_data_value) = key_no_data {
+                if no_data_value == key {
+                    return;
+                }
             }
-        }
 
-        if ignore_keys.contains(key) {
-            continue;
-        }
+            if let Some(no_data_value) = parameter_no_data {
+                if no_data_value == *val {
+                    return;
+                }
+            }
 
-        *count_d.entry(*key).or_insert_with(HashMap::new).entry(*val).or_insert(0) += 1;
-    }
+            *count_d.entry(key).or_insert_with(FxHashMap::default).entry(*val).or_insert(0) += 1;
+        });
 
-    let mut result: HashMap<String, i32> = HashMap::new();
-    for (key, sub_map) in &count_d {
-        if let Some((&val, &_count)) = sub_map.iter().max_by_key(|&(_, count)| count) {
-            result.insert(key.to_string(), val);
-        }
+        y += rows;
     }
 
-    Ok(result)
+    let mut modes: Vec<(i32, i32)> = count_d.iter()
+        .filter_map(|(&key, sub_map)| {
+            sub_map.iter().max_by_key(|&(_, count)| count).map(|(&val, _)| (key, val))
+        })
+        .collect();
+    modes.sort_unstable_by_key(|&(key, _)| key);
+
+    Ok(modes)
 }
 
 /// Identify the mode (most common) parameter values across intersecting raster key datasets.
@@ -114,8 +439,8 @@ fn identify_mode_single_raster_key(
 /// * `key2_fn: &str` - File path to the second raster dataset providing key values.
 /// * `parameter_fn: &str` - File path to the raster data providing parameter values to calculate the mode for each key pair.
 /// * `ignore_channels: bool` - If `true`, keys that are multiples of 10 are ignored during processing.
-/// * `mut ignore_keys: HashSet<i32>` - A set of key values to ignore during processing. If a "no data" value is defined in the key raster datasets, it should be added to this set.
-/// * `mut ignore_keys2: HashSet<i32>` - A set of key values to ignore during processing. If a "no data" value is defined in the key2 raster datasets, it should be added to this set.
+/// * `ignore_keys: numpy.ndarray` - A 1-d `int32` array of key values to ignore, sorted ascending. The key raster's "no data" value is always excluded, whether or not it appears here.
+/// * `ignore_keys2: numpy.ndarray` - A 1-d `int32` array of key2 values to ignore, sorted ascending. The key2 raster's "no data" value is always excluded, whether or not it appears here.
 ///
 /// # Returns
 /// 
@@ -124,9 +449,8 @@ fn identify_mode_single_raster_key(
 ///
 /// # Errors
 /// 
-/// Returns `Err` if there is a failure reading the raster data from the provided file paths.
-/// Note: In the current implementation using `unwrap()`, the function may panic on errors 
-/// (improvement recommended for production use).
+/// Raises `IOError` if a raster cannot be opened, and `ValueError` if the band index is
+/// invalid or the rasters do not share the same dimensions.
 ///
 /// # Example
 /// 
@@ -135,81 +459,161 @@ fn identify_mode_single_raster_key(
 /// let key2_fn = "path/to/key2_map.tif";
 /// let parameter_fn = "path/to/parameter_map.tif";
 /// let ignore_channels = false;
-/// let mut ignore_keys = HashSet::new();
-/// ignore_keys.insert(-9999);
+/// let ignore_keys = numpy.array([-9999], dtype=numpy.int32)  # built on the Python side
 /// 
 /// let result = identify_mode_intersecting_raster_keys(key_fn, key2_fn, parameter_fn, ignore_channels, ignore_keys);
 /// ```
 ///
 /// # Note
 ///
-/// Ensure that the raster datasets provided via `key_fn`, `key2_fn`, and `parameter_fn` are of 
-/// identical dimensions as the function does not perform dimensionality checks.
+/// Raster dimensions are validated once up front, so the per-pixel scan can assume
+/// identical indexing across rasters.
+///
+/// The GIL is released while the rasters are read and scanned, so multiple rasters can be
+/// processed concurrently from a Python `ThreadPoolExecutor`.
 ///
 /// # Panics
 ///
-/// The function may panic if it is unable to read the raster data from the provided paths.
+/// The function may panic if a raster fails mid-scan after validation (e.g. a truncated file).
 #[pyfunction]
 fn identify_mode_intersecting_raster_keys(
-    key_fn: &str, 
-    key2_fn: &str, 
+    py: Python,
+    key_fn: &str,
+    key2_fn: &str,
     parameter_fn: &str,
     ignore_channels: bool,
-    mut ignore_keys: HashSet<i32>,
-    mut ignore_keys2: HashSet<i32>,
+    ignore_keys: PyReadonlyArray1<i32>,
+    ignore_keys2: PyReadonlyArray1<i32>,
     band_indx: isize
 ) -> PyResult<HashMap<String, HashMap<String, i32>>> {
+    let ignore_keys: &[i32] = ignore_keys.as_slice()?;
+    let ignore_keys2: &[i32] = ignore_keys2.as_slice()?;
 
-    let key_map: Raster<i32> = Raster::<i32>::read(key_fn).unwrap();
-    let key2_map: Raster<i32> = Raster::<i32>::read(key2_fn).unwrap();
-    let parameter_map: Raster<i32> = Raster::<i32>::read_band(parameter_fn, band_indx).unwrap();
-    
-    // Handle no_data values for key_map and key2_map
-    if let Some(no_data_value) = key_map.no_data {
-        ignore_keys.insert(no_data_value);
+    let modes = py.allow_threads(move || mode_intersecting_raster_keys_impl(
+        key_fn, key2_fn, parameter_fn, ignore_channels, ignore_keys, ignore_keys2, band_indx
+    ))?;
+
+    let mut result: HashMap<String, HashMap<String, i32>> = HashMap::new();
+    for (key, key2, val) in modes {
+        result.entry(key.to_string()).or_insert_with(HashMap::new)
+            .insert(key2.to_string(), val);
     }
-    if let Some(no_data_value) = key2_map.no_data {
-        ignore_keys2.insert(no_data_value);
+    Ok(result)
+}
+
+/// Array-returning variant of `identify_mode_intersecting_raster_keys`.
+///
+/// Returns `(keys, keys2, modes)` as three 1-d `int32` NumPy arrays sorted by
+/// (key, key2), built with three bulk copies instead of nested Python dicts.
+#[pyfunction]
+fn identify_mode_intersecting_raster_keys_arrays<'py>(
+    py: Python<'py>,
+    key_fn: &str,
+    key2_fn: &str,
+    parameter_fn: &str,
+    ignore_channels: bool,
+    ignore_keys: PyReadonlyArray1<i32>,
+    ignore_keys2: PyReadonlyArray1<i32>,
+    band_indx: isize
+) -> PyResult<(&'py PyArray1<i32>, &'py PyArray1<i32>, &'py PyArray1<i32>)> {
+    let ignore_keys: &[i32] = ignore_keys.as_slice()?;
+    let ignore_keys2: &[i32] = ignore_keys2.as_slice()?;
+
+    let modes = py.allow_threads(move || mode_intersecting_raster_keys_impl(
+        key_fn, key2_fn, parameter_fn, ignore_channels, ignore_keys, ignore_keys2, band_indx
+    ))?;
+
+    let mut keys: Vec<i32> = Vec::with_capacity(modes.len());
+    let mut keys2: Vec<i32> = Vec::with_capacity(modes.len());
+    let mut vals: Vec<i32> = Vec::with_capacity(modes.len());
+    for (key, key2, val) in modes {
+        keys.push(key);
+        keys2.push(key2);
+        vals.push(val);
     }
-    
-    // Nested HashMap to store count information: key -> key2 -> parameter_value -> count
-    let mut count_d: HashMap<i32, HashMap<i32, HashMap<i32, usize>>> = HashMap::new();
-    
-    // Iterate through corresponding entries in the three rasters
-    for ((key, key2), val) in key_map.data.iter().zip(key2_map.data.iter()).zip(parameter_map.data.iter()) {
-        if ignore_channels && key % 10 == 4 {
-            continue;
-        }
-        
-        if let Some(no_data_value) = parameter_map.no_data {
-            if no_data_value == *val {
-                continue;
+    Ok((PyArray1::from_vec(py, keys), PyArray1::from_vec(py, keys2), PyArray1::from_vec(py, vals)))
+}
+
+fn mode_intersecting_raster_keys_impl(
+    key_fn: &str,
+    key2_fn: &str,
+    parameter_fn: &str,
+    ignore_channels: bool,
+    ignore_keys: &[i32],
+    ignore_keys2: &[i32],
+    band_indx: isize
+) -> PyResult<Vec<(i32, i32, i32)>> {
+
+    let key_ds = open_dataset(key_fn)?;
+    let key_band = open_band(&key_ds, key_fn, 1)?;
+    let key2_ds = open_dataset(key2_fn)?;
+    let key2_band = open_band(&key2_ds, key2_fn, 1)?;
+    let parameter_ds = open_dataset(parameter_fn)?;
+    let parameter_band = open_band(&parameter_ds, parameter_fn, band_indx)?;
+
+    let (width, height) = key_ds.raster_size();
+    check_same_size(key2_fn, &key2_ds, key_fn, (width, height))?;
+    check_same_size(parameter_fn, &parameter_ds, key_fn, (width, height))?;
+
+    let key_no_data: Option<i32> = key_band.no_data_value().map(|v| v as i32);
+    let key2_no_data: Option<i32> = key2_band.no_data_value().map(|v| v as i32);
+    let parameter_no_data: Option<i32> = parameter_band.no_data_value().map(|v| v as i32);
+
+    // Count information keyed by the packed (key, key2) pair: the per-pixel join
+    // touches one single-word HashMap entry instead of two nested maps
+    let mut count_d: FxHashMap<u64, FxHashMap<i32, usize>> = FxHashMap::default();
+
+    // Stream the corresponding chunk from all three rasters in lockstep so the
+    // join stays in cache
+    let chunk = chunk_rows(&parameter_band);
+    let mut y: usize = 0;
+    while y < height {
+        let rows = chunk.min(height - y);
+        let keys = key_band.read_as::<i32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+        let keys2 = key2_band.read_as::<i32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+        let vals = parameter_band.read_as::<i32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+
+        scan_chunk_intersecting(&keys, &keys2, &vals, ignore_channels, ignore_keys, ignore_keys2, &mut |key, key2, val: &i32| {
+            if let Some(no_data_value) = key_no_data {
+                if no_data_value == key {
+                    return;
+                }
             }
-        }
-        
-        if ignore_keys.contains(key) || ignore_keys2.contains(key2) {
-            continue;
-        }
-        
-        // Increment the count for the current key, key2, and parameter value
-        *count_d.entry(*key).or_insert_with(HashMap::new)
-            .entry(*key2).or_insert_with(HashMap::new)
-            .entry(*val).or_insert(0) += 1;
-    }
-    
-    // Determine the mode value for each key, key2 pair
-    let mut result: HashMap<String, HashMap<String, i32>> = HashMap::new();
-    for (key, sub_map) in &count_d {
-        let mut key2_mode_map: HashMap<String, i32> = HashMap::new();
-        for (key2, val_count_map) in sub_map {
-            if let Some((&val, &_count)) = val_count_map.iter().max_by_key(|&(_, count)| count) {
-                key2_mode_map.insert(key2.to_string(), val);
+
+            if let Some(no_data_value) = key2_no_data {
+                if no_data_value == key2 {
+                    return;
+                }
             }
-        }
-        result.insert(key.to_string(), key2_mode_map);
+
+            if let Some(no_data_value) = parameter_no_data {
+                if no_data_value == *val {
+                    return;
+                }
+            }
+
+            // Increment the count for the current key, key2, and parameter value
+            *count_d.entry(pack_keys(key, key2)).or_insert_with(FxHashMap::default)
+                .entry(*val).or_insert(0) += 1;
+        });
+
+        y += rows;
     }
     
-    Ok(result)
+    // Determine the mode value for each key, key2 pair
+    let mut modes: Vec<(u64, i32)> = count_d.iter()
+        .filter_map(|(&packed, val_count_map)| {
+            val_count_map.iter().max_by_key(|&(_, count)| count).map(|(&val, _)| (packed, val))
+        })
+        .collect();
+    modes.sort_unstable_by_key(|&(packed, _)| packed);
+
+    Ok(modes.into_iter()
+        .map(|(packed, val)| {
+            let (key, key2) = unpack_keys(packed);
+            (key, key2, val)
+        })
+        .collect())
 }
 
 /// Identify the median value of each key in a raster dataset.
@@ -225,8 +629,8 @@ fn identify_mode_intersecting_raster_keys(
 /// * `key_fn: &str` - The file path to the raster data to be used as keys.
 /// * `parameter_fn: &str` - The file path to the raster data to determine the mode value for each key.
 /// * `ignore_channels: bool` - If `true`, keys that end in 4.
-/// * `mut ignore_keys: HashSet<i32>` - A set of keys to be ignored during processing. If a "no data" 
-///    value is defined in `key_map`, it is automatically added to this set.
+/// * `ignore_keys: numpy.ndarray` - A 1-d `int32` array of keys to ignore, sorted ascending.
+///    The key raster's "no data" value is always excluded, whether or not it appears here.
 ///
 /// # Returns
 /// 
@@ -236,9 +640,8 @@ fn identify_mode_intersecting_raster_keys(
 ///
 /// # Errors
 /// 
-/// Returns `Err` if there is a failure reading the raster data from the provided file paths.
-/// Note: The current implementation uses `unwrap()` which may cause panics on errors 
-/// (to be improved for production use).
+/// Raises `IOError` if a raster cannot be opened, and `ValueError` if the band index is
+/// invalid or the rasters do not share the same dimensions.
 ///
 /// # Example
 /// 
@@ -246,62 +649,131 @@ fn identify_mode_intersecting_raster_keys(
 /// let key_fn = "path/to/key_map.tif";
 /// let parameter_fn = "path/to/parameter_map.tif";
 /// let ignore_channels = false;
-/// let mut ignore_keys = HashSet::new();
-/// ignore_keys.insert(-9999);
+/// let ignore_keys = numpy.array([-9999], dtype=numpy.int32)  # built on the Python side
 /// 
 /// let result = identify_median_single_raster_key(key_fn, parameter_fn, ignore_channels, ignore_keys);
 /// ```
 ///
 /// # Note
 ///
-/// Ensure that the raster datasets provided via `key_fn` and `parameter_fn` are of 
-/// identical dimensions, as the function does not perform dimensionality checks.
+/// Raster dimensions are validated once up front, so the per-pixel scan can assume
+/// identical indexing across rasters.
+///
+/// The GIL is released while the rasters are read and scanned, so multiple rasters can be
+/// processed concurrently from a Python `ThreadPoolExecutor`.
 ///
 /// # Panics
 ///
-/// The function may panic if it is unable to read the raster data from the provided paths.
+/// The function may panic if a raster fails mid-scan after validation (e.g. a truncated file).
 #[pyfunction]
 fn identify_median_single_raster_key(
+    py: Python,
     key_fn: &str,
     parameter_fn: &str,
     ignore_channels: bool,
-    mut ignore_keys: HashSet<i32>,
+    ignore_keys: PyReadonlyArray1<i32>,
     band_indx: isize
 ) -> PyResult<HashMap<String, f64>> {
-    let key_map: Raster<i32> = Raster::<i32>::read(key_fn).unwrap();
-    let parameter_map: Raster<f64> = Raster::<f64>::read_band(parameter_fn, band_indx).unwrap();
+    let ignore_keys: &[i32] = ignore_keys.as_slice()?;
 
-    if let Some(no_data_value) = key_map.no_data {
-        ignore_keys.insert(no_data_value);
-    }
+    let medians = py.allow_threads(move || median_single_raster_key_impl(
+        key_fn, parameter_fn, ignore_channels, ignore_keys, band_indx
+    ))?;
 
-    let mut values_d: HashMap<i32, Vec<f64>> = HashMap::new();
+    Ok(medians.into_iter().map(|(key, val)| (key.to_string(), val)).collect())
+}
 
-    for (key, &val) in key_map.data.iter().zip(parameter_map.data.iter()) {
-        if ignore_channels && key % 10 == 4 {
-            continue;
-        }
+/// Array-returning variant of `identify_median_single_raster_key`.
+///
+/// Returns `(keys, medians)` as 1-d `int32` and `float64` NumPy arrays sorted
+/// by key, built with two bulk copies instead of one Python string and dict
+/// entry per key. Preferred when the caller indexes the result with NumPy anyway.
+#[pyfunction]
+fn identify_median_single_raster_key_arrays<'py>(
+    py: Python<'py>,
+    key_fn: &str,
+    parameter_fn: &str,
+    ignore_channels: bool,
+    ignore_keys: PyReadonlyArray1<i32>,
+    band_indx: isize
+) -> PyResult<(&'py PyArray1<i32>, &'py PyArray1<f64>)> {
+    let ignore_keys: &[i32] = ignore_keys.as_slice()?;
+
+    let medians = py.allow_threads(move || median_single_raster_key_impl(
+        key_fn, parameter_fn, ignore_channels, ignore_keys, band_indx
+    ))?;
+
+    let (keys, vals): (Vec<i32>, Vec<f64>) = medians.into_iter().unzip();
+    Ok((PyArray1::from_vec(py, keys), PyArray1::from_vec(py, vals)))
+}
 
-        if let Some(no_data_value) = parameter_map.no_data {
-            if (no_data_value - val).abs() < std::f64::EPSILON {
-                continue;
+fn median_single_raster_key_impl(
+    key_fn: &str,
+    parameter_fn: &str,
+    ignore_channels: bool,
+    ignore_keys: &[i32],
+    band_indx: isize
+) -> PyResult<Vec<(i32, f64)>> {
+    let key_ds = open_dataset(key_fn)?;
+    let key_band = open_band(&key_ds, key_fn, 1)?;
+    let parameter_ds = open_dataset(parameter_fn)?;
+    let parameter_band = open_band(&parameter_ds, parameter_fn, band_indx)?;
+
+    let (width, height) = key_ds.raster_size();
+    check_same_size(parameter_fn, &parameter_ds, key_fn, (width, height))?;
+
+    let key_no_data: Option<i32> = key_band.no_data_value().map(|v| v as i32);
+    let parameter_no_data: Option<f32> = parameter_band.no_data_value().map(|v| v as f32);
+
+    // Values are accumulated in the parameter band's working precision (f32),
+    // halving the accumulator's memory traffic; they are widened to f64 only at
+    // the per-key reduction step.
+    // One contiguous (key, value) accumulator instead of a HashMap of per-key
+    // Vecs: the scan just appends, and grouping happens afterwards with a radix
+    // sort on the key. This avoids millions of tiny Vec allocations and the
+    // per-pixel hash probe on wide rasters.
+    let mut accum: Vec<(i32, f32)> = Vec::new();
+
+    let chunk = chunk_rows(&parameter_band);
+    let mut y: usize = 0;
+    while y < height {
+        let rows = chunk.min(height - y);
+        let keys = key_band.read_as::<i32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+        let vals = parameter_band.read_as::<f32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+
+        scan_chunk_single(&keys, &vals, ignore_channels, ignore_keys, &mut |key, &val: &f32| {
+            if let Some(no_data_value) = key_no_data {
+                if no_data_value == key {
+                    return;
+                }
             }
-        }
 
-        if ignore_keys.contains(key) {
-            continue;
-        }
+            if let Some(no_data_value) = parameter_no_data {
+                if (no_data_value - val).abs() < std::f32::EPSILON {
+                    return;
+                }
+            }
 
-        values_d.entry(*key).or_insert_with(Vec::new).push(val);
-    }
+            accum.push((key, val));
+        });
 
-    let mut result: HashMap<String, f64> = HashMap::new();
-    for (key, values) in values_d {
-        let median = calculate_median(values);
-        result.insert(key.to_string(), median);
+        y += rows;
     }
 
-    Ok(result)
+    radsort::sort_by_key(&mut accum, |&(key, _)| key);
+
+    // The per-key medians are independent; reduce the runs across all cores.
+    // The runs are in key order, so the collected pairs are sorted by key
+    let medians: Vec<(i32, f64)> = key_runs(&accum)
+        .par_iter()
+        .map(|&(start, end)| {
+            let key = accum[start].0;
+            let mut values: Vec<f64> = accum[start..end].iter().map(|&(_, val)| val as f64).collect();
+            (key, calculate_median(&mut values))
+        })
+        .collect();
+
+    Ok(medians)
 }
 
 
@@ -320,8 +792,8 @@ fn identify_median_single_raster_key(
 /// * `key2_fn: &str` - File path to the second raster dataset providing key values.
 /// * `parameter_fn: &str` - File path to the raster data providing parameter values to calculate the mode for each key pair.
 /// * `ignore_channels: bool` - If `true`, keys that are multiples of 10 are ignored during processing.
-/// * `mut ignore_keys: HashSet<i32>` - A set of key values to ignore during processing. If a "no data" value is defined in the key raster datasets, it should be added to this set.
-/// * `mut ignore_keys2: HashSet<i32>` - A set of key values to ignore during processing. If a "no data" value is defined in the key2 raster datasets, it should be added to this set.
+/// * `ignore_keys: numpy.ndarray` - A 1-d `int32` array of key values to ignore, sorted ascending. The key raster's "no data" value is always excluded, whether or not it appears here.
+/// * `ignore_keys2: numpy.ndarray` - A 1-d `int32` array of key2 values to ignore, sorted ascending. The key2 raster's "no data" value is always excluded, whether or not it appears here.
 ///
 /// # Returns
 /// 
@@ -330,9 +802,8 @@ fn identify_median_single_raster_key(
 ///
 /// # Errors
 /// 
-/// Returns `Err` if there is a failure reading the raster data from the provided file paths.
-/// Note: In the current implementation using `unwrap()`, the function may panic on errors 
-/// (improvement recommended for production use).
+/// Raises `IOError` if a raster cannot be opened, and `ValueError` if the band index is
+/// invalid or the rasters do not share the same dimensions.
 ///
 /// # Example
 /// 
@@ -341,85 +812,468 @@ fn identify_median_single_raster_key(
 /// let key2_fn = "path/to/key2_map.tif";
 /// let parameter_fn = "path/to/parameter_map.tif";
 /// let ignore_channels = false;
-/// let mut ignore_keys = HashSet::new();
-/// ignore_keys.insert(-9999);
+/// let ignore_keys = numpy.array([-9999], dtype=numpy.int32)  # built on the Python side
 /// 
 /// let result = identify_mode_intersecting_raster_keys(key_fn, key2_fn, parameter_fn, ignore_channels, ignore_keys);
 /// ```
 ///
 /// # Note
 ///
-/// Ensure that the raster datasets provided via `key_fn`, `key2_fn`, and `parameter_fn` are of 
-/// identical dimensions as the function does not perform dimensionality checks.
+/// Raster dimensions are validated once up front, so the per-pixel scan can assume
+/// identical indexing across rasters.
+///
+/// The GIL is released while the rasters are read and scanned, so multiple rasters can be
+/// processed concurrently from a Python `ThreadPoolExecutor`.
 ///
 /// # Panics
 ///
-/// The function may panic if it is unable to read the raster data from the provided paths.
+/// The function may panic if a raster fails mid-scan after validation (e.g. a truncated file).
 #[pyfunction]
 fn identify_median_intersecting_raster_keys(
+    py: Python,
     key_fn: &str,
     key2_fn: &str,
     parameter_fn: &str,
     ignore_channels: bool,
-    mut ignore_keys: HashSet<i32>,
-    mut ignore_keys2: HashSet<i32>,
+    ignore_keys: PyReadonlyArray1<i32>,
+    ignore_keys2: PyReadonlyArray1<i32>,
     band_indx: isize
 ) -> PyResult<HashMap<String, HashMap<String, f64>>> {
-    let key_map: Raster<i32> = Raster::<i32>::read(key_fn).unwrap();
-    let key2_map: Raster<i32> = Raster::<i32>::read(key2_fn).unwrap();
-    let parameter_map: Raster<f64> = Raster::<f64>::read_band(parameter_fn, band_indx).unwrap();
+    let ignore_keys: &[i32] = ignore_keys.as_slice()?;
+    let ignore_keys2: &[i32] = ignore_keys2.as_slice()?;
 
-    if let Some(no_data_value) = key_map.no_data {
-        ignore_keys.insert(no_data_value);
+    let medians = py.allow_threads(move || median_intersecting_raster_keys_impl(
+        key_fn, key2_fn, parameter_fn, ignore_channels, ignore_keys, ignore_keys2, band_indx
+    ))?;
+
+    let mut result: HashMap<String, HashMap<String, f64>> = HashMap::new();
+    for (key, key2, median) in medians {
+        result.entry(key.to_string()).or_insert_with(HashMap::new)
+            .insert(key2.to_string(), median);
     }
-    if let Some(no_data_value) = key2_map.no_data {
-        ignore_keys2.insert(no_data_value);
+    Ok(result)
+}
+
+/// Array-returning variant of `identify_median_intersecting_raster_keys`.
+///
+/// Returns `(keys, keys2, medians)` as two 1-d `int32` arrays and one
+/// `float64` NumPy array sorted by (key, key2), built with three bulk copies
+/// instead of nested Python dicts.
+#[pyfunction]
+fn identify_median_intersecting_raster_keys_arrays<'py>(
+    py: Python<'py>,
+    key_fn: &str,
+    key2_fn: &str,
+    parameter_fn: &str,
+    ignore_channels: bool,
+    ignore_keys: PyReadonlyArray1<i32>,
+    ignore_keys2: PyReadonlyArray1<i32>,
+    band_indx: isize
+) -> PyResult<(&'py PyArray1<i32>, &'py PyArray1<i32>, &'py PyArray1<f64>)> {
+    let ignore_keys: &[i32] = ignore_keys.as_slice()?;
+    let ignore_keys2: &[i32] = ignore_keys2.as_slice()?;
+
+    let medians = py.allow_threads(move || median_intersecting_raster_keys_impl(
+        key_fn, key2_fn, parameter_fn, ignore_channels, ignore_keys, ignore_keys2, band_indx
+    ))?;
+
+    let mut keys: Vec<i32> = Vec::with_capacity(medians.len());
+    let mut keys2: Vec<i32> = Vec::with_capacity(medians.len());
+    let mut vals: Vec<f64> = Vec::with_capacity(medians.len());
+    for (key, key2, median) in medians {
+        keys.push(key);
+        keys2.push(key2);
+        vals.push(median);
     }
+    Ok((PyArray1::from_vec(py, keys), PyArray1::from_vec(py, keys2), PyArray1::from_vec(py, vals)))
+}
 
-    // Nested HashMap to store value information: key -> key2 -> parameter_values
-    let mut values_d: HashMap<i32, HashMap<i32, Vec<f64>>> = HashMap::new();
+fn median_intersecting_raster_keys_impl(
+    key_fn: &str,
+    key2_fn: &str,
+    parameter_fn: &str,
+    ignore_channels: bool,
+    ignore_keys: &[i32],
+    ignore_keys2: &[i32],
+    band_indx: isize
+) -> PyResult<Vec<(i32, i32, f64)>> {
+    let key_ds = open_dataset(key_fn)?;
+    let key_band = open_band(&key_ds, key_fn, 1)?;
+    let key2_ds = open_dataset(key2_fn)?;
+    let key2_band = open_band(&key2_ds, key2_fn, 1)?;
+    let parameter_ds = open_dataset(parameter_fn)?;
+    let parameter_band = open_band(&parameter_ds, parameter_fn, band_indx)?;
 
-    for ((key, key2), &val) in key_map.data.iter().zip(key2_map.data.iter()).zip(parameter_map.data.iter()) {
-        if ignore_channels && key % 10 == 4 {
-            continue;
-        }
+    let (width, height) = key_ds.raster_size();
+    check_same_size(key2_fn, &key2_ds, key_fn, (width, height))?;
+    check_same_size(parameter_fn, &parameter_ds, key_fn, (width, height))?;
+
+    let key_no_data: Option<i32> = key_band.no_data_value().map(|v| v as i32);
+    let key2_no_data: Option<i32> = key2_band.no_data_value().map(|v| v as i32);
+    let parameter_no_data: Option<f32> = parameter_band.no_data_value().map(|v| v as f32);
 
-        if let Some(no_data_value) = parameter_map.no_data {
-            if (no_data_value - val).abs() < std::f64::EPSILON {
-                continue;
+    // One contiguous (packed key pair, value) accumulator instead of nested
+    // HashMaps of per-pair Vecs; see median_single_raster_key_impl
+    let mut accum: Vec<(u64, f32)> = Vec::new();
+
+    // Stream the corresponding chunk from all three rasters in lockstep so the
+    // join stays in cache
+    let chunk = chunk_rows(&parameter_band);
+    let mut y: usize = 0;
+    while y < height {
+        let rows = chunk.min(height - y);
+        let keys = key_band.read_as::<i32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+        let keys2 = key2_band.read_as::<i32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+        let vals = parameter_band.read_as::<f32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+
+        scan_chunk_intersecting(&keys, &keys2, &vals, ignore_channels, ignore_keys, ignore_keys2, &mut |key, key2, &val: &f32| {
+            if let Some(no_data_value) = key_no_data {
+                if no_data_value == key {
+                    return;
+                }
             }
-        }
 
-        if ignore_keys.contains(key) || ignore_keys2.contains(key2) {
-            continue;
+            if let Some(no_data_value) = key2_no_data {
+                if no_data_value == key2 {
+                    return;
+                }
+            }
+
+            if let Some(no_data_value) = parameter_no_data {
+                if (no_data_value - val).abs() < std::f32::EPSILON {
+                    return;
+                }
+            }
+
+            accum.push((pack_keys(key, key2), val));
+        });
+
+        y += rows;
+    }
+
+    radsort::sort_by_key(&mut accum, |&(packed, _)| packed);
+
+    // Compute the median value for each contiguous key, key2 run across all
+    // cores. The runs are in packed-key order, so the collected triples are
+    // sorted by (key, key2)
+    let medians: Vec<(i32, i32, f64)> = key_runs(&accum)
+        .par_iter()
+        .map(|&(start, end)| {
+            let (key, key2) = unpack_keys(accum[start].0);
+            let mut values: Vec<f64> = accum[start..end].iter().map(|&(_, val)| val as f64).collect();
+            (key, key2, calculate_median(&mut values))
+        })
+        .collect();
+
+    Ok(medians)
+}
+
+
+/// Identify median parameter values across intersecting keys for a batch of parameter rasters.
+///
+/// Each call to `identify_median_intersecting_raster_keys` repeats the key join — reading
+/// both key rasters and running the channel/ignore/no-data tests — for a single parameter
+/// raster. Watershed workflows commonly summarize several soil properties over the same
+/// key pair, so this entry point pays the join once per pixel: the key chunks are read and
+/// filtered a single time, and the surviving pixel indices are replayed against each
+/// parameter raster's chunk to fill one accumulator per parameter.
+///
+/// # Arguments
+///
+/// * `key_fn: &str` - The file path to the first raster dataset providing keys.
+/// * `key2_fn: &str` - The file path to the second raster dataset providing keys.
+/// * `parameter_fns: Vec<String>` - The file paths to the parameter rasters, all sharing
+///    the key rasters' dimensions.
+/// * `ignore_channels: bool` - If `true`, keys that end in 4.
+/// * `ignore_keys: numpy.ndarray` - A 1-d `int32` array of keys from `key_fn` to ignore, sorted ascending.
+/// * `ignore_keys2: numpy.ndarray` - A 1-d `int32` array of keys from `key2_fn` to ignore, sorted ascending.
+/// * `band_indx: isize` - The 1-based index of the band to read from every parameter raster.
+///
+/// # Returns
+///
+/// `PyResult<HashMap<String, HashMap<String, Vec<f64>>>>` - A nested HashMap keyed like
+/// `identify_median_intersecting_raster_keys`, whose leaf value is the list of medians
+/// aligned with `parameter_fns`. A key pair with no valid samples in some parameter
+/// raster (all no-data) carries `NaN` at that parameter's position.
+///
+/// # Errors
+///
+/// Raises `IOError` if a raster cannot be opened, and `ValueError` if the band index is
+/// invalid or the rasters do not share the same dimensions.
+///
+/// # Note
+///
+/// The GIL is released while the rasters are read and scanned, so multiple batches can be
+/// processed concurrently from a Python `ThreadPoolExecutor`.
+///
+/// # Panics
+///
+/// The function may panic if a raster fails mid-scan after validation (e.g. a truncated file).
+#[pyfunction]
+fn identify_median_intersecting_raster_keys_batch(
+    py: Python,
+    key_fn: &str,
+    key2_fn: &str,
+    parameter_fns: Vec<String>,
+    ignore_channels: bool,
+    ignore_keys: PyReadonlyArray1<i32>,
+    ignore_keys2: PyReadonlyArray1<i32>,
+    band_indx: isize
+) -> PyResult<HashMap<String, HashMap<String, Vec<f64>>>> {
+    let ignore_keys: &[i32] = ignore_keys.as_slice()?;
+    let ignore_keys2: &[i32] = ignore_keys2.as_slice()?;
+
+    py.allow_threads(move || median_intersecting_raster_keys_batch_impl(
+        key_fn, key2_fn, &parameter_fns, ignore_channels, ignore_keys, ignore_keys2, band_indx
+    ))
+}
+
+fn median_intersecting_raster_keys_batch_impl(
+    key_fn: &str,
+    key2_fn: &str,
+    parameter_fns: &[String],
+    ignore_channels: bool,
+    ignore_keys: &[i32],
+    ignore_keys2: &[i32],
+    band_indx: isize
+) -> PyResult<HashMap<String, HashMap<String, Vec<f64>>>> {
+    let key_ds = open_dataset(key_fn)?;
+    let key_band = open_band(&key_ds, key_fn, 1)?;
+    let key2_ds = open_dataset(key2_fn)?;
+    let key2_band = open_band(&key2_ds, key2_fn, 1)?;
+
+    let (width, height) = key_ds.raster_size();
+    check_same_size(key2_fn, &key2_ds, key_fn, (width, height))?;
+
+    let mut parameter_dss: Vec<Dataset> = Vec::with_capacity(parameter_fns.len());
+    for parameter_fn in parameter_fns {
+        parameter_dss.push(open_dataset(parameter_fn)?);
+    }
+
+    let mut parameter_bands: Vec<RasterBand> = Vec::with_capacity(parameter_fns.len());
+    for (parameter_fn, parameter_ds) in parameter_fns.iter().zip(parameter_dss.iter()) {
+        check_same_size(parameter_fn, parameter_ds, key_fn, (width, height))?;
+        parameter_bands.push(open_band(parameter_ds, parameter_fn, band_indx)?);
+    }
+
+    let key_no_data: Option<i32> = key_band.no_data_value().map(|v| v as i32);
+    let key2_no_data: Option<i32> = key2_band.no_data_value().map(|v| v as i32);
+    let parameter_no_data: Vec<Option<f32>> = parameter_bands.iter()
+        .map(|band| band.no_data_value().map(|v| v as f32))
+        .collect();
+
+    let mut accums: Vec<Vec<(u64, f32)>> = vec![Vec::new(); parameter_fns.len()];
+
+    // The key join is paid once per pixel: the key chunks are scanned a single
+    // time into a (pixel index, packed key pair) selection, which is then
+    // replayed against each parameter raster's chunk
+    let chunk = chunk_rows(&key_band);
+    let index: Vec<u32> = (0..chunk * width).map(|i| i as u32).collect();
+    let mut sel: Vec<(usize, u64)> = Vec::new();
+    let mut y: usize = 0;
+    while y < height {
+        let rows = chunk.min(height - y);
+        let keys = key_band.read_as::<i32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+        let keys2 = key2_band.read_as::<i32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+
+        sel.clear();
+        scan_chunk_intersecting(&keys, &keys2, &index[..keys.len()], ignore_channels, ignore_keys, ignore_keys2, &mut |key, key2, &i: &u32| {
+            if let Some(no_data_value) = key_no_data {
+                if no_data_value == key {
+                    return;
+                }
+            }
+
+            if let Some(no_data_value) = key2_no_data {
+                if no_data_value == key2 {
+                    return;
+                }
+            }
+
+            sel.push((i as usize, pack_keys(key, key2)));
+        });
+
+        for (parameter_indx, parameter_band) in parameter_bands.iter().enumerate() {
+            let vals = parameter_band.read_as::<f32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+
+            let accum = &mut accums[parameter_indx];
+            for &(i, packed) in &sel {
+                let val = vals[i];
+                if let Some(no_data_value) = parameter_no_data[parameter_indx] {
+                    if (no_data_value - val).abs() < std::f32::EPSILON {
+                        continue;
+                    }
+                }
+                accum.push((packed, val));
+            }
         }
 
-        values_d.entry(*key).or_insert_with(HashMap::new)
-            .entry(*key2).or_insert_with(Vec::new).push(val);
+        y += rows;
     }
 
-    // Compute the median value for each key, key2 pair
-    let mut result: HashMap<String, HashMap<String, f64>> = HashMap::new();
-    for (key, sub_map) in values_d {
-        let mut key2_median_map: HashMap<String, f64> = HashMap::new();
-        for (key2, values) in sub_map {
-            let median = calculate_median(values);
-            key2_median_map.insert(key2.to_string(), median);
+    // Reduce each parameter's accumulator exactly as the single-parameter kernel
+    // does, then align the per-pair medians across parameters with NaN fill
+    let mut result: HashMap<String, HashMap<String, Vec<f64>>> = HashMap::new();
+    for (parameter_indx, accum) in accums.iter_mut().enumerate() {
+        radsort::sort_by_key(accum, |&(packed, _)| packed);
+
+        let medians: Vec<(i32, i32, f64)> = key_runs(accum)
+            .par_iter()
+            .map(|&(start, end)| {
+                let (key, key2) = unpack_keys(accum[start].0);
+                let mut values: Vec<f64> = accum[start..end].iter().map(|&(_, val)| val as f64).collect();
+                (key, key2, calculate_median(&mut values))
+            })
+            .collect();
+
+        for (key, key2, median) in medians {
+            result.entry(key.to_string()).or_insert_with(HashMap::new)
+                .entry(key2.to_string())
+                .or_insert_with(|| vec![f64::NAN; parameter_fns.len()])
+                [parameter_indx] = median;
         }
-        result.insert(key.to_string(), key2_median_map);
     }
 
     Ok(result)
 }
 
 
-fn calculate_median(mut values: Vec<f64>) -> f64 {
-    values.sort_by(|a, b| a.partial_cmp(b).unwrap_or(std::cmp::Ordering::Equal));
+/// Identify both the mode and the median value of each key in a raster dataset in one pass.
+///
+/// Soil and landcover workflows commonly need the modal and the median parameter value for
+/// the same sub-basins; calling `identify_mode_single_raster_key` and
+/// `identify_median_single_raster_key` separately reads and scans the parameter raster
+/// twice. This entry point walks the rasters once, accumulating per-key samples a single
+/// time, then computes both aggregates from each key's contiguous run. Mode counting uses
+/// the parameter value rounded to the nearest integer, matching how the mode kernel reads
+/// the band as `i32`.
+///
+/// # Arguments
+///
+/// Same as `identify_median_single_raster_key`.
+///
+/// # Returns
+///
+/// `PyResult<(HashMap<String, i32>, HashMap<String, f64>)>` - The mode map and the median
+/// map, keyed by the stringified raster key.
+///
+/// # Errors
+///
+/// Raises `IOError` if a raster cannot be opened, and `ValueError` if the band index is
+/// invalid or the rasters do not share the same dimensions.
+///
+/// # Note
+///
+/// The GIL is released while the rasters are read and scanned, so multiple rasters can be
+/// processed concurrently from a Python `ThreadPoolExecutor`.
+#[pyfunction]
+fn identify_mode_and_median_single_raster_key(
+    py: Python,
+    key_fn: &str,
+    parameter_fn: &str,
+    ignore_channels: bool,
+    ignore_keys: PyReadonlyArray1<i32>,
+    band_indx: isize
+) -> PyResult<(HashMap<String, i32>, HashMap<String, f64>)> {
+    let ignore_keys: &[i32] = ignore_keys.as_slice()?;
+
+    py.allow_threads(move || mode_and_median_single_raster_key_impl(
+        key_fn, parameter_fn, ignore_channels, ignore_keys, band_indx
+    ))
+}
+
+fn mode_and_median_single_raster_key_impl(
+    key_fn: &str,
+    parameter_fn: &str,
+    ignore_channels: bool,
+    ignore_keys: &[i32],
+    band_indx: isize
+) -> PyResult<(HashMap<String, i32>, HashMap<String, f64>)> {
+    let key_ds = open_dataset(key_fn)?;
+    let key_band = open_band(&key_ds, key_fn, 1)?;
+    let parameter_ds = open_dataset(parameter_fn)?;
+    let parameter_band = open_band(&parameter_ds, parameter_fn, band_indx)?;
+
+    let (width, height) = key_ds.raster_size();
+    check_same_size(parameter_fn, &parameter_ds, key_fn, (width, height))?;
+
+    let key_no_data: Option<i32> = key_band.no_data_value().map(|v| v as i32);
+    let parameter_no_data: Option<f32> = parameter_band.no_data_value().map(|v| v as f32);
+
+    let mut accum: Vec<(i32, f32)> = Vec::new();
+
+    let chunk = chunk_rows(&parameter_band);
+    let mut y: usize = 0;
+    while y < height {
+        let rows = chunk.min(height - y);
+        let keys = key_band.read_as::<i32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+        let vals = parameter_band.read_as::<f32>((0, y as isize), (width, rows), (width, rows), None).unwrap().data;
+
+        scan_chunk_single(&keys, &vals, ignore_channels, ignore_keys, &mut |key, &val: &f32| {
+            if let Some(no_data_value) = key_no_data {
+                if no_data_value == key {
+                    return;
+                }
+            }
+
+            if let Some(no_data_value) = parameter_no_data {
+                if (no_data_value - val).abs() < std::f32::EPSILON {
+                    return;
+                }
+            }
+
+            accum.push((key, val));
+        });
+
+        y += rows;
+    }
+
+    radsort::sort_by_key(&mut accum, |&(key, _)| key);
+
+    // Both aggregates are independent per key; reduce the runs across all cores
+    let reduced: Vec<(String, Option<i32>, f64)> = key_runs(&accum)
+        .par_iter()
+        .map(|&(start, end)| {
+            let key = accum[start].0;
+            let mut values: Vec<f64> = accum[start..end].iter().map(|&(_, val)| val as f64).collect();
+
+            let mut counts: FxHashMap<i32, usize> = FxHashMap::default();
+            for &val in values.iter() {
+                *counts.entry(val.round() as i32).or_insert(0) += 1;
+            }
+            let mode = counts.iter().max_by_key(|&(_, count)| count).map(|(&val, _)| val);
+
+            (key.to_string(), mode, calculate_median(&mut values))
+        })
+        .collect();
+
+    let mut mode_result: HashMap<String, i32> = HashMap::new();
+    let mut median_result: HashMap<String, f64> = HashMap::new();
+    for (key, mode, median) in reduced {
+        if let Some(val) = mode {
+            mode_result.insert(key.clone(), val);
+        }
+        median_result.insert(key, median);
+    }
+
+    Ok((mode_result, median_result))
+}
+
+/// Median via introselect (`select_nth_unstable_by`) rather than a full sort.
+///
+/// Sorting every per-key bucket is O(n log n) per bucket and dominates the median
+/// variants relative to the mode/mean ones on the same data; selection is O(n).
+/// For even-length buckets the lower middle element is the maximum of the partition
+/// left of the selected index, so no second selection pass is needed.
+fn calculate_median(values: &mut [f64]) -> f64 {
     let len = values.len();
+    let mid = len / 2;
+    let (lower, upper_mid, _) = values.select_nth_unstable_by(mid, |a, b| a.total_cmp(b));
     if len % 2 == 1 {
-        values[len / 2]
+        *upper_mid
     } else {
-        (values[(len - 1) / 2] + values[len / 2]) / 2.0
+        let lower_mid = lower.iter().copied().fold(f64::NEG_INFINITY, f64::max);
+        (lower_mid + *upper_mid) / 2.0
     }
 }
 
@@ -428,9 +1282,15 @@ fn calculate_median(mut values: Vec<f64>) -> f64 {
 #[pymodule]
 fn raster_characteristics_rust(_py: Python, m: &PyModule) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(identify_mode_single_raster_key, m)?)?;
+    m.add_function(wrap_pyfunction!(identify_mode_single_raster_key_arrays, m)?)?;
+    m.add_function(wrap_pyfunction!(identify_mode_and_median_single_raster_key, m)?)?;
     m.add_function(wrap_pyfunction!(identify_mode_intersecting_raster_keys, m)?)?;
+    m.add_function(wrap_pyfunction!(identify_mode_intersecting_raster_keys_arrays, m)?)?;
     m.add_function(wrap_pyfunction!(identify_median_single_raster_key, m)?)?;
+    m.add_function(wrap_pyfunction!(identify_median_single_raster_key_arrays, m)?)?;
     m.add_function(wrap_pyfunction!(identify_median_intersecting_raster_keys, m)?)?;
+    m.add_function(wrap_pyfunction!(identify_median_intersecting_raster_keys_arrays, m)?)?;
+    m.add_function(wrap_pyfunction!(identify_median_intersecting_raster_keys_batch, m)?)?;
     Ok(())
 }
 
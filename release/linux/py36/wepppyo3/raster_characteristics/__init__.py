@@ -1,108 +1,280 @@
-from typing import Set, Dict, Optional
+from typing import FrozenSet, List, Sequence, Set, Dict, Optional, Tuple, Union
+
+from functools import lru_cache
+
+import numpy as np
 
 from .raster_characteristics_rust import (
     identify_mode_intersecting_raster_keys as _identify_mode_intersecting_raster_keys,
+    identify_mode_intersecting_raster_keys_arrays as _identify_mode_intersecting_raster_keys_arrays,
     identify_mode_single_raster_key as _identify_mode_single_raster_key,
+    identify_mode_single_raster_key_arrays as _identify_mode_single_raster_key_arrays,
+    identify_mode_and_median_single_raster_key as _identify_mode_and_median_single_raster_key,
     identify_median_intersecting_raster_keys as _identify_median_intersecting_raster_keys,
+    identify_median_intersecting_raster_keys_arrays as _identify_median_intersecting_raster_keys_arrays,
+    identify_median_intersecting_raster_keys_batch as _identify_median_intersecting_raster_keys_batch,
     identify_median_single_raster_key as _identify_median_single_raster_key,
+    identify_median_single_raster_key_arrays as _identify_median_single_raster_key_arrays,
 )
 
+# ignore_keys can be given as a plain set, a range, or a pre-built, sorted int32
+# ndarray. Either way a sorted int32 ndarray is what crosses the PyO3 boundary
+# (zero-copy); set and range inputs are converted once and memoized, so pipelines
+# that loop over hundreds of sub-basins with the same ignore_keys pay for the
+# conversion a single time. When every key fits in 0..128 — the common case for
+# contiguous landcover/soil code ranges — the Rust side collapses the table to a
+# u128 bitset probed with one shift and one AND per pixel.
+IgnoreKeys = Union[Set[int], range, np.ndarray]
+
+_EMPTY_IGNORE_KEYS = np.empty(0, dtype=np.int32)
+
 
-def _handle_common_args(ignore_keys: Optional[Set[int]], band_indx: int) -> Set[int]:
+@lru_cache(maxsize=8)
+def _prepare_ignore_keys(ignore_keys: FrozenSet[int]) -> np.ndarray:
+    return np.array(sorted(ignore_keys), dtype=np.int32)
+
+
+def _handle_common_args(ignore_keys: Optional[IgnoreKeys], band_indx: int) -> np.ndarray:
     if band_indx < 1:
         raise ValueError(f"band_indx must be >= 1. Got {band_indx} instead.")
-    
-    return set() if ignore_keys is None else ignore_keys
+
+    if ignore_keys is None:
+        return _EMPTY_IGNORE_KEYS
+
+    if isinstance(ignore_keys, np.ndarray):
+        if ignore_keys.ndim != 1 or ignore_keys.dtype != np.int32:
+            raise ValueError("ignore_keys arrays must be 1-d with dtype int32")
+        # the Rust membership probes (binary search, bitset range detection)
+        # assume ascending order; an unsorted table would corrupt results
+        # silently, so reject it here — the check is trivially cheap for
+        # tables this size
+        if ignore_keys.size > 1 and not np.all(np.diff(ignore_keys) >= 0):
+            raise ValueError("ignore_keys arrays must be sorted ascending")
+        return ignore_keys
+
+    return _prepare_ignore_keys(frozenset(ignore_keys))
 
 
 def identify_mode_single_raster_key(
     key_fn: str,
     parameter_fn: str,
     ignore_channels: bool = True,
-    ignore_keys: Optional[Set[int]] = None,
+    ignore_keys: Optional[IgnoreKeys] = None,
     band_indx: int = 1
 ) -> Dict[str, int]:
     ignore_keys = _handle_common_args(ignore_keys, band_indx)
 
     return _identify_mode_single_raster_key(
-        key_fn=key_fn, 
+        key_fn=key_fn,
         parameter_fn=parameter_fn,
         ignore_channels=ignore_channels,
         ignore_keys=ignore_keys,
         band_indx=band_indx
     )
-    
+
 identify_mode_single_raster_key.__doc__ = _identify_mode_single_raster_key.__doc__
 
 
+def identify_mode_single_raster_key_arrays(
+    key_fn: str,
+    parameter_fn: str,
+    ignore_channels: bool = True,
+    ignore_keys: Optional[IgnoreKeys] = None,
+    band_indx: int = 1
+) -> Tuple[np.ndarray, np.ndarray]:
+    ignore_keys = _handle_common_args(ignore_keys, band_indx)
+
+    return _identify_mode_single_raster_key_arrays(
+        key_fn=key_fn,
+        parameter_fn=parameter_fn,
+        ignore_channels=ignore_channels,
+        ignore_keys=ignore_keys,
+        band_indx=band_indx
+    )
+
+identify_mode_single_raster_key_arrays.__doc__ = _identify_mode_single_raster_key_arrays.__doc__
+
+
+def identify_mode_and_median_single_raster_key(
+    key_fn: str,
+    parameter_fn: str,
+    ignore_channels: bool = True,
+    ignore_keys: Optional[IgnoreKeys] = None,
+    band_indx: int = 1
+) -> Tuple[Dict[str, int], Dict[str, float]]:
+    ignore_keys = _handle_common_args(ignore_keys, band_indx)
+
+    return _identify_mode_and_median_single_raster_key(
+        key_fn=key_fn,
+        parameter_fn=parameter_fn,
+        ignore_channels=ignore_channels,
+        ignore_keys=ignore_keys,
+        band_indx=band_indx
+    )
+
+identify_mode_and_median_single_raster_key.__doc__ = _identify_mode_and_median_single_raster_key.__doc__
+
+
 def identify_median_single_raster_key(
     key_fn: str,
     parameter_fn: str,
     ignore_channels: bool = True,
-    ignore_keys: Optional[Set[int]] = None,
+    ignore_keys: Optional[IgnoreKeys] = None,
     band_indx: int = 1
 ) -> Dict[str, float]:
     ignore_keys = _handle_common_args(ignore_keys, band_indx)
 
     return _identify_median_single_raster_key(
-        key_fn=key_fn, 
+        key_fn=key_fn,
         parameter_fn=parameter_fn,
         ignore_channels=ignore_channels,
         ignore_keys=ignore_keys,
         band_indx=band_indx
     )
-    
+
 identify_median_single_raster_key.__doc__ = _identify_median_single_raster_key.__doc__
 
 
+def identify_median_single_raster_key_arrays(
+    key_fn: str,
+    parameter_fn: str,
+    ignore_channels: bool = True,
+    ignore_keys: Optional[IgnoreKeys] = None,
+    band_indx: int = 1
+) -> Tuple[np.ndarray, np.ndarray]:
+    ignore_keys = _handle_common_args(ignore_keys, band_indx)
+
+    return _identify_median_single_raster_key_arrays(
+        key_fn=key_fn,
+        parameter_fn=parameter_fn,
+        ignore_channels=ignore_channels,
+        ignore_keys=ignore_keys,
+        band_indx=band_indx
+    )
+
+identify_median_single_raster_key_arrays.__doc__ = _identify_median_single_raster_key_arrays.__doc__
+
+
 def identify_mode_intersecting_raster_keys(
     key_fn: str,
     key2_fn: str,
     parameter_fn: str,
     ignore_channels: bool = True,
-    ignore_keys: Optional[Set[int]] = None,
-    ignore_keys2: Optional[Set[int]] = None,
+    ignore_keys: Optional[IgnoreKeys] = None,
+    ignore_keys2: Optional[IgnoreKeys] = None,
     band_indx: int = 1
 ) -> Dict[str, int]:
     ignore_keys = _handle_common_args(ignore_keys, band_indx)
-
-    ignore_keys2 = set() if ignore_keys2 is None else ignore_keys2
+    ignore_keys2 = _handle_common_args(ignore_keys2, band_indx)
 
     return _identify_mode_intersecting_raster_keys(
-        key_fn=key_fn, 
-        key2_fn=key2_fn, 
+        key_fn=key_fn,
+        key2_fn=key2_fn,
         parameter_fn=parameter_fn,
         ignore_channels=ignore_channels,
         ignore_keys=ignore_keys,
         ignore_keys2=ignore_keys2,
         band_indx=band_indx
     )
-    
+
 identify_mode_intersecting_raster_keys.__doc__ = _identify_mode_intersecting_raster_keys.__doc__
 
 
+def identify_mode_intersecting_raster_keys_arrays(
+    key_fn: str,
+    key2_fn: str,
+    parameter_fn: str,
+    ignore_channels: bool = True,
+    ignore_keys: Optional[IgnoreKeys] = None,
+    ignore_keys2: Optional[IgnoreKeys] = None,
+    band_indx: int = 1
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    ignore_keys = _handle_common_args(ignore_keys, band_indx)
+    ignore_keys2 = _handle_common_args(ignore_keys2, band_indx)
+
+    return _identify_mode_intersecting_raster_keys_arrays(
+        key_fn=key_fn,
+        key2_fn=key2_fn,
+        parameter_fn=parameter_fn,
+        ignore_channels=ignore_channels,
+        ignore_keys=ignore_keys,
+        ignore_keys2=ignore_keys2,
+        band_indx=band_indx
+    )
+
+identify_mode_intersecting_raster_keys_arrays.__doc__ = _identify_mode_intersecting_raster_keys_arrays.__doc__
+
+
 def identify_median_intersecting_raster_keys(
     key_fn: str,
     key2_fn: str,
     parameter_fn: str,
     ignore_channels: bool = True,
-    ignore_keys: Optional[Set[int]] = None,
-    ignore_keys2: Optional[Set[int]] = None,
+    ignore_keys: Optional[IgnoreKeys] = None,
+    ignore_keys2: Optional[IgnoreKeys] = None,
     band_indx: int = 1
 ) -> Dict[str, float]:
     ignore_keys = _handle_common_args(ignore_keys, band_indx)
-
-    ignore_keys2 = set() if ignore_keys2 is None else ignore_keys2
+    ignore_keys2 = _handle_common_args(ignore_keys2, band_indx)
 
     return _identify_median_intersecting_raster_keys(
-        key_fn=key_fn, 
-        key2_fn=key2_fn, 
+        key_fn=key_fn,
+        key2_fn=key2_fn,
         parameter_fn=parameter_fn,
         ignore_channels=ignore_channels,
         ignore_keys=ignore_keys,
         ignore_keys2=ignore_keys2,
         band_indx=band_indx
     )
-    
+
 identify_median_intersecting_raster_keys.__doc__ = _identify_median_intersecting_raster_keys.__doc__
 
+
+def identify_median_intersecting_raster_keys_arrays(
+    key_fn: str,
+    key2_fn: str,
+    parameter_fn: str,
+    ignore_channels: bool = True,
+    ignore_keys: Optional[IgnoreKeys] = None,
+    ignore_keys2: Optional[IgnoreKeys] = None,
+    band_indx: int = 1
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    ignore_keys = _handle_common_args(ignore_keys, band_indx)
+    ignore_keys2 = _handle_common_args(ignore_keys2, band_indx)
+
+    return _identify_median_intersecting_raster_keys_arrays(
+        key_fn=key_fn,
+        key2_fn=key2_fn,
+        parameter_fn=parameter_fn,
+        ignore_channels=ignore_channels,
+        ignore_keys=ignore_keys,
+        ignore_keys2=ignore_keys2,
+        band_indx=band_indx
+    )
+
+identify_median_intersecting_raster_keys_arrays.__doc__ = _identify_median_intersecting_raster_keys_arrays.__doc__
+
+
+def identify_median_intersecting_raster_keys_batch(
+    key_fn: str,
+    key2_fn: str,
+    parameter_fns: Sequence[str],
+    ignore_channels: bool = True,
+    ignore_keys: Optional[IgnoreKeys] = None,
+    ignore_keys2: Optional[IgnoreKeys] = None,
+    band_indx: int = 1
+) -> Dict[str, Dict[str, List[float]]]:
+    ignore_keys = _handle_common_args(ignore_keys, band_indx)
+    ignore_keys2 = _handle_common_args(ignore_keys2, band_indx)
+
+    return _identify_median_intersecting_raster_keys_batch(
+        key_fn=key_fn,
+        key2_fn=key2_fn,
+        parameter_fns=list(parameter_fns),
+        ignore_channels=ignore_channels,
+        ignore_keys=ignore_keys,
+        ignore_keys2=ignore_keys2,
+        band_indx=band_indx
+    )
+
+identify_median_intersecting_raster_keys_batch.__doc__ = _identify_median_intersecting_raster_keys_batch.__doc__